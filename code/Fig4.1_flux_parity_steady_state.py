@@ -18,7 +18,7 @@ ppGpp_data = pd.read_csv('../data/main_figure_data/ecoli_relative_ppGpp.csv')
 #%%
 # Evaluate the flux parity model over the metabolic rates
 nu_range = np.linspace(0.05, 30, 300)
-df = pd.DataFrame([])
+out = np.empty((len(nu_range), 5))
 for i, nu in enumerate(tqdm.tqdm(nu_range)):
     _args = {'gamma_max':const['gamma_max'], 
              'nu_max': nu,
@@ -27,18 +27,21 @@ for i, nu in enumerate(tqdm.tqdm(nu_range)):
              'phi_O': const['phi_O'],
              'kappa_max': const['kappa_max'],
              'tau': const['tau']}
-    out = growth.integrate.equilibrate_FPM(_args, max_iter=100)
-    gamma = const['gamma_max'] * out[-1] / (out[-1] + const['Kd_TAA_star'])
-    balance = out[-1] / out[-2]
-    phiRb = (1 - const['phi_O']) * balance / (balance + const['tau'])
-    lam = gamma * phiRb
-    _df = pd.DataFrame([np.array([phiRb, lam, gamma])], columns=['phiRb', 'growth_rate', 'gamma'])
-    _df['TAA'] = out[-2]
-    _df['TAA_star'] = out[-1]
-    _df['tRNA_per_ribosome'] = ((out[-2] + out[-1]) * out[0]) / (out[1] / const['m_Rb'])
-    _df['ratio']= out[-1] / out[-2]
-    _df['nu_max'] = nu
-    df = pd.concat([df, _df])
+    out[i] = growth.integrate.equilibrate_FPM(_args, max_iter=100)
+
+# Compute the steady-state quantities over all metabolic rates at once
+M, M_Rb, TAA, TAA_star = out[:, 0], out[:, 1], out[:, -2], out[:, -1]
+gamma = const['gamma_max'] * TAA_star / (TAA_star + const['Kd_TAA_star'])
+ratio = TAA_star / TAA
+phiRb = (1 - const['phi_O']) * ratio / (ratio + const['tau'])
+df = pd.DataFrame({'phiRb': phiRb,
+                   'growth_rate': gamma * phiRb,
+                   'gamma': gamma,
+                   'TAA': TAA,
+                   'TAA_star': TAA_star,
+                   'tRNA_per_ribosome': ((TAA + TAA_star) * M) / (M_Rb / const['m_Rb']),
+                   'ratio': ratio,
+                   'nu_max': nu_range})
 
 #%%    
 ref_args = {'gamma_max':const['gamma_max'], 
@@ -21,7 +21,7 @@ phi_O = const['phi_O']
 # Set the range of phiR
 phi_Rb = np.arange(0.001, 1 - phi_O - 0.001, 0.01)
 dt = 0.001
-df = pd.DataFrame({})
+records = []
 for i, phi in enumerate(tqdm.tqdm(phi_Rb)):
     # Equilibrate the model at this phiR
     args = {'gamma_max': gamma_max,
@@ -52,7 +52,8 @@ for i, phi in enumerate(tqdm.tqdm(phi_Rb)):
                'phi_Rb': phi,
                'metabolic_flux': nu * (1 - phi_O - phi),
                'translational_flux': gamma * phi}
-    df = df.append(results, ignore_index=True)
+    records.append(results)
+df = pd.DataFrame(records)
 
 #%% 
 # find the optimal values
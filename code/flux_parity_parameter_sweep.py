@@ -1,7 +1,9 @@
-import numpy as np 
-import pandas as pd 
+import numpy as np
+import pandas as pd
 import growth.integrate
+import itertools
 import tqdm
+from multiprocessing import Pool
 const = growth.model.load_constants()
 
 nu_max = [0.1, 0.5, 4.5, 10, 15]
@@ -12,26 +14,38 @@ Kd_TAA_star = const['Kd_TAA_star']
 kappa_range = np.logspace(-6, 0, 100)
 tau_range = np.logspace(-4, 2, 100)
 
-df = pd.DataFrame([])
-for i, tau in enumerate(tqdm.tqdm(tau_range, desc='Iterating through tau')):
-    for j, kappa in enumerate(tqdm.tqdm(kappa_range, desc='Iterating through kappa')):
-        for k, nu in enumerate(tqdm.tqdm(nu_max, desc="Iterationg through nu")):
-            _args = {'gamma_max':gamma_max,
-                    'nu_max':nu,
-                    'Kd_TAA':Kd_TAA,
-                    'Kd_TAA_star':Kd_TAA_star,
-                    'kappa_max':kappa,
-                    'phi_O':phi_O,
-                    'tau': tau}
-            out = growth.integrate.equilibrate_FPM(_args, max_iter=20)
-            _df = pd.DataFrame([out[-2:]], columns=['TAA', 'TAA_star'])
-            _df['gamma'] = gamma_max * out[-1] / (out[-1] + Kd_TAA_star)
-            _df['balance'] = out[-1] / out[-2]
-            _df['phiRb'] = (1 - const['phi_O']) * _df['balance'] / (_df['balance'] + tau)
-            _df['tau'] = tau
-            _df['kappa_max'] = kappa
-            _df['growth_rate'] = _df['gamma'] * _df['phiRb']
-            _df['nu_max'] = nu
-            df = pd.concat([df, _df], ignore_index=True)  
 
-df.to_csv('../data/flux_parity_parameter_sweep.csv', index=False)
\ No newline at end of file
+def _sweep_one(params):
+    """Equilibrates the flux-parity model at the i-th (tau, kappa, nu) point
+    and returns the steady-state quantities as a record."""
+    i, (tau, kappa, nu) = params
+    _args = {'gamma_max':gamma_max,
+            'nu_max':nu,
+            'Kd_TAA':Kd_TAA,
+            'Kd_TAA_star':Kd_TAA_star,
+            'kappa_max':kappa,
+            'phi_O':phi_O,
+            'tau': tau}
+    out = growth.integrate.equilibrate_FPM(_args, max_iter=20)
+    gamma = gamma_max * out[-1] / (out[-1] + Kd_TAA_star)
+    balance = out[-1] / out[-2]
+    phiRb = (1 - const['phi_O']) * balance / (balance + tau)
+    return i, (out[-2], out[-1], gamma, balance, phiRb, tau, kappa, gamma * phiRb, nu)
+
+
+if __name__ == '__main__':
+    # Every point of the sweep is independent and is dispatched to a worker
+    # process. Results are placed by index as they complete, such that the rows
+    # are in the same tau, kappa, nu order as the nested loops.
+    grid = list(itertools.product(tau_range, kappa_range, nu_max))
+    records = [None] * len(grid)
+    with Pool(processes=None) as p, \
+        tqdm.tqdm(total=len(grid), desc='Iterating through parameters') as pbar:
+        for i, record in p.imap_unordered(_sweep_one, enumerate(grid), chunksize=50):
+            records[i] = record
+            pbar.update(1)
+    df = pd.DataFrame.from_records(records, columns=['TAA', 'TAA_star', 'gamma', 'balance',
+                                                     'phiRb', 'tau', 'kappa_max',
+                                                     'growth_rate', 'nu_max'])
+
+    df.to_csv('../data/flux_parity_parameter_sweep.csv', index=False)
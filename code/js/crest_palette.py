@@ -0,0 +1,17 @@
+#%%
+import json
+import numpy as np
+import seaborn as sns
+
+# ############################################################################## 
+# PALETTE GENERATION
+# ############################################################################## 
+# Generates the hex codes of the crest palette used to color the metabolic 
+# rate slider of the interactive steady-state figure. This must be rerun if 
+# the slider range in interactive_steadystate.py is changed.
+nu_start, nu_end, nu_step = [0.01, 20, 0.1]
+nu_range = np.arange(nu_start, nu_end, nu_step)
+cmap = sns.color_palette('crest', n_colors=len(nu_range) + 1).as_hex()
+with open('./crest_palette.json', 'w') as f:
+    json.dump(cmap, f)
+# %%
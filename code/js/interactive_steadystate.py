@@ -1,7 +1,7 @@
 #%%
+import json
 import numpy as np 
 import bokeh.io 
-import seaborn as sns
 import bokeh.plotting 
 import bokeh.layouts
 import bokeh.models
@@ -21,15 +21,19 @@ nu_max = 4.5
 nu_start, nu_end, nu_step = [0.01, 20, 0.1]
 nu_range = np.arange(nu_start, nu_end, nu_step)
 Kd_cpc = const['Kd_cpc']
-ind = np.where(np.round(nu_range, decimals=1) == nu_max)[0][0]
-cmap = sns.color_palette('crest', n_colors=len(nu_range) + 1).as_hex()
+ind = int(np.round((nu_max - nu_start) / nu_step))
+# Precomputed crest palette with one color per slider value. See crest_palette.py
+with open('./crest_palette.json', 'r') as f:
+    cmap = json.load(f)
 
 # ############################################################################## 
 # INITIALIZATION    
 # ############################################################################## 
-growth_rate = growth.model.steady_state_growth_rate(gamma_max, phiRb_range, nu_range[ind], Kd_cpc, phi_O)
-cpc = growth.model.steady_state_precursors(gamma_max, phiRb_range, nu_range[ind], Kd_cpc, phi_O)
-gamma = growth.model.steady_state_gamma(gamma_max, phiRb_range, nu_range[ind], Kd_cpc, phi_O)
+# The growth rate, precursors, and gamma are evaluated together over the full
+# phiRb_range array
+nu_init = nu_range[ind]
+growth_rate, cpc, gamma = growth.model.steady_state_all(gamma_max, phiRb_range, nu_init,
+                                                        Kd_cpc, phi_O)
 source = bokeh.models.ColumnDataSource({'phiRb': [phiRb_range], 
                                         'lam':[growth_rate / growth_rate.max()],
                                         'cpc':[cpc / Kd_cpc],
@@ -1,14 +1,368 @@
+import functools
 import numpy as np 
 import pandas as pd 
 import scipy.integrate
+import numba
 import tqdm
 from .model import self_replicator_FPM 
 
+# Arguments which alter the flux-parity model beyond the core dynamics. If any
+# of these are present, the general (dictionary-based) model is integrated.
+_FPM_MODIFIERS = ('nutrients', 'antibiotic', 'ansatz', 'f_a')
+
+
+@numba.njit(cache=True)
+def fpm_rhs(t, 
+            y, 
+            nu_max, 
+            gamma_max, 
+            Kd_TAA, 
+            Kd_TAA_star, 
+            tau, 
+            kappa_max, 
+            phi_O, 
+            phiRb):
+    """
+    Compiled right-hand side of the core flux-parity model. This is equivalent 
+    to `self_replicator_FPM` without nutrients, antibiotics, or alternative 
+    ansatzes, but takes all parameters as positional floats.
+
+    Parameters
+    ----------
+    t : float
+        Evaluated time step of the system.
+    y : numpy array, [M, M_Rb, M_Mb, T_AA, T_AA_star]
+        The current state of the system. 
+    nu_max, gamma_max, Kd_TAA, Kd_TAA_star, tau, kappa_max, phi_O: float
+        Model parameters. See documentation for `self_replicator_FPM`.
+    phiRb : float
+        The fixed allocation towards ribosomes. If negative, the allocation 
+        is regulated dynamically by the charged/uncharged tRNA balance.
+
+    Returns
+    -------
+    out : numpy array, [dM_dt, dM_Rb_dt, dM_Mb_dt, dT_AA_dt, dT_AA_star_dt]
+        The evaluated ODEs at the specified time step.
+    """
+    M, M_Rb, M_Mb, T_AA, T_AA_star = y[0], y[1], y[2], y[3], y[4]
+
+    # Compute the capacities
+    gamma = gamma_max * (T_AA_star / (T_AA_star + Kd_TAA_star))
+    nu = nu_max * (T_AA / (T_AA + Kd_TAA))
+
+    # Resource allocation
+    ratio = T_AA_star / T_AA
+    allocation = ratio / (ratio + tau)
+    if phiRb < 0:
+        _phiRb = (1 - phi_O) * allocation
+        kappa = kappa_max * allocation
+    else:
+        _phiRb = phiRb
+        kappa = phiRb * kappa_max / (1 - phi_O)
+
+    # Biomass accumulation and tRNA dynamics, including dilution
+    dM_dt = gamma * M_Rb
+    out = np.empty(5)
+    out[0] = dM_dt
+    out[1] = _phiRb * dM_dt
+    out[2] = (1 - _phiRb - phi_O) * dM_dt
+    out[3] = (dM_dt - nu * M_Mb) / M + kappa - (T_AA * dM_dt) / M
+    out[4] = (nu * M_Mb - dM_dt) / M - T_AA_star * dM_dt / M
+    return out
+
+
+@numba.njit(cache=True)
+def fpm_jac(t, 
+            y, 
+            nu_max, 
+            gamma_max, 
+            Kd_TAA, 
+            Kd_TAA_star, 
+            tau, 
+            kappa_max, 
+            phi_O, 
+            phiRb):
+    """
+    Compiled analytic Jacobian of `fpm_rhs`. Takes the same arguments as 
+    `fpm_rhs`.
+
+    Returns
+    -------
+    jac : 2d numpy array
+        The 5x5 matrix of partial derivatives, where jac[i, j] is the 
+        derivative of the i-th ODE with respect to the j-th state variable.
+    """
+    M, M_Rb, M_Mb, T_AA, T_AA_star = y[0], y[1], y[2], y[3], y[4]
+
+    # Capacities and their derivatives
+    gamma = gamma_max * (T_AA_star / (T_AA_star + Kd_TAA_star))
+    dgamma = gamma_max * Kd_TAA_star / (T_AA_star + Kd_TAA_star)**2
+    nu = nu_max * (T_AA / (T_AA + Kd_TAA))
+    dnu = nu_max * Kd_TAA / (T_AA + Kd_TAA)**2
+
+    # Allocation, written as T_AA_star / (T_AA_star + tau * T_AA), and its 
+    # derivatives with respect to the uncharged and charged tRNA.
+    denom = (T_AA_star + tau * T_AA)**2
+    allocation = T_AA_star / (T_AA_star + tau * T_AA)
+    dalloc_T = -tau * T_AA_star / denom
+    dalloc_S = tau * T_AA / denom
+    if phiRb < 0:
+        _phiRb = (1 - phi_O) * allocation
+        dphi_T = (1 - phi_O) * dalloc_T
+        dphi_S = (1 - phi_O) * dalloc_S
+        dkappa_T = kappa_max * dalloc_T
+        dkappa_S = kappa_max * dalloc_S
+    else:
+        _phiRb = phiRb
+        dphi_T = 0.0
+        dphi_S = 0.0
+        dkappa_T = 0.0
+        dkappa_S = 0.0
+    phiMb = 1 - _phiRb - phi_O
+
+    dM_dt = gamma * M_Rb
+    jac = np.zeros((5, 5))
+
+    # Biomass accumulation and allocation
+    jac[0, 1] = gamma
+    jac[0, 4] = dgamma * M_Rb
+    jac[1, 1] = _phiRb * gamma
+    jac[1, 3] = dphi_T * dM_dt
+    jac[1, 4] = dphi_S * dM_dt + _phiRb * dgamma * M_Rb
+    jac[2, 1] = phiMb * gamma
+    jac[2, 3] = -dphi_T * dM_dt
+    jac[2, 4] = -dphi_S * dM_dt + phiMb * dgamma * M_Rb
+
+    # Uncharged tRNA
+    jac[3, 0] = -((1 - T_AA) * dM_dt - nu * M_Mb) / M**2
+    jac[3, 1] = (1 - T_AA) * gamma / M
+    jac[3, 2] = -nu / M
+    jac[3, 3] = (-dM_dt - dnu * M_Mb) / M + dkappa_T
+    jac[3, 4] = (1 - T_AA) * dgamma * M_Rb / M + dkappa_S
+
+    # Charged tRNA
+    jac[4, 0] = -(nu * M_Mb - (1 + T_AA_star) * dM_dt) / M**2
+    jac[4, 1] = -(1 + T_AA_star) * gamma / M
+    jac[4, 2] = nu / M
+    jac[4, 3] = dnu * M_Mb / M
+    jac[4, 4] = (-dM_dt - (1 + T_AA_star) * dgamma * M_Rb) / M
+    return jac
+
+
+@numba.njit(cache=True)
+def _rk4_step(y, params, dt):
+    """Takes a single fourth-order Runge-Kutta step of `fpm_rhs`."""
+    nu_max, gamma_max, Kd_TAA, Kd_TAA_star, tau, kappa_max, phi_O, phiRb = params
+    k1 = fpm_rhs(0.0, y, nu_max, gamma_max, Kd_TAA, Kd_TAA_star, tau, 
+                 kappa_max, phi_O, phiRb)
+    k2 = fpm_rhs(0.0, y + 0.5 * dt * k1, nu_max, gamma_max, Kd_TAA, 
+                 Kd_TAA_star, tau, kappa_max, phi_O, phiRb)
+    k3 = fpm_rhs(0.0, y + 0.5 * dt * k2, nu_max, gamma_max, Kd_TAA, 
+                 Kd_TAA_star, tau, kappa_max, phi_O, phiRb)
+    k4 = fpm_rhs(0.0, y + dt * k3, nu_max, gamma_max, Kd_TAA, Kd_TAA_star, 
+                 tau, kappa_max, phi_O, phiRb)
+    return y + dt * (k1 + 2 * k2 + 2 * k3 + k4) / 6
+
+
+@numba.njit(cache=True)
+def equilibrate_rk4(y0, params, dt=1E-5, tol=1E-6, max_iter=20000000):
+    """
+    Equilibrates the core flux-parity model with fixed-step fourth-order 
+    Runge-Kutta integration in a compiled loop. The biomass terms are 
+    renormalized by the total biomass after every step, such that the 
+    intensive state variables approach a steady state.
+
+    Parameters
+    ----------
+    y0 : numpy array, [M, M_Rb, M_Mb, T_AA, T_AA_star]
+        The initial state of the system.
+    params : numpy array
+        The positional parameters of `fpm_rhs`, [nu_max, gamma_max, Kd_TAA, 
+        Kd_TAA_star, tau, kappa_max, phi_O, phiRb].
+    dt : float
+        The integration time step. As the system is stiff when the charged 
+        tRNA is depleted, this must be well below the inverse of 
+        gamma_max * phiRb / Kd_TAA_star for the integration to be stable. 
+        Default is 1E-5 time units.
+    tol : float
+        The relative rate of change (per unit time) of all intensive state 
+        variables below which the system is considered to be in steady state. 
+        Default is 1E-6.
+    max_iter : int
+        The maximum number of steps to be taken. Default is 2E7.
+
+    Returns
+    -------
+    y : numpy array
+        The final state of the system, normalized to a total biomass of 1.
+    converged : bool
+        Whether a finite steady state was reached within max_iter steps. 
+
+    Notes
+    -----
+    This scheme is explicit and is not suited to the stiff regimes of the 
+    model (e.g. near-zero or near-maximal allocation towards ribosomes), where 
+    `equilibrate_FPM` should be used.
+    """
+    y = y0.copy()
+    y[:3] /= y0[0]
+    for _ in range(max_iter):
+        y_new = _rk4_step(y, params, dt)
+        y_new[:3] /= y_new[0]
+        if not (np.all(np.isfinite(y_new)) and np.all(y_new > 0)):
+            return y_new, False
+        change = np.max(np.abs(y_new[1:] - y[1:]) / y[1:])
+        y = y_new
+        if change < tol * dt:
+            return y, True
+    return y, False
+
+
+def _equilibrate(rhs, 
+                 rhs_args, 
+                 init_params, 
+                 phi_O, 
+                 tau, 
+                 phiRb, 
+                 tol, 
+                 max_iter, 
+                 dt, 
+                 t_return, 
+                 jac=None,
+                 tfirst=False):
+    """
+    Repeatedly integrates the supplied ODEs until the ribosomal mass fraction 
+    matches the (fixed or regulated) allocation. See `equilibrate_FPM`.
+    """
+    M0 = 1E9
+    iterations = 1 
+    converged = False
+    max_time = 200
+    # Only the final time points are inspected or returned, so odeint is only 
+    # asked for those points of the np.arange(0, max_time, dt) grid. The time 
+    # stepping itself remains internal to the LSODA solver, which is allowed 
+    # as many internal steps as the dense grid would have provided.
+    n_steps = int(np.ceil(max_time / dt))
+    time = np.append(0, np.arange(n_steps - t_return, n_steps) * dt)
+    while (iterations <= max_iter) & (converged == False):
+        out = scipy.integrate.odeint(rhs, 
+                                    init_params, 
+                                    time,
+                                    args=rhs_args,
+                                    Dfun=jac,
+                                    tfirst=tfirst,
+                                    mxstep=n_steps) 
+    
+        # Determine if a steady state has been reached
+        ratio = out[-1][-1] / out[-1][-2]
+        MRb_M = out[-1][1] / out[-1][0]
+        if phiRb < 0:
+            _phiRb = (1 - phi_O) * ratio / (ratio + tau)
+        else:
+            _phiRb = phiRb
+        ribo_ratio = MRb_M / _phiRb
+        if np.round(ribo_ratio, decimals=tol) == 1:
+            converged = True
+        else:
+            MRb_M = out[-1][1]/out[-1][0]
+            MMb_M = out[-1][2]/out[-1][0]
+            init_params = [M0, MRb_M * M0, MMb_M * M0, out[-1][-2], out[-1][-1]]
+            # max_time += 10 
+            iterations +=1
+
+       
+        if iterations == max_iter:
+            print(f'Steady state was not reached (ratio of Mrb_M / phiRb= {np.round(ribo_ratio, decimals=tol)}. Returning output anyway.')
+    if t_return != 1:
+        return out[-t_return:]
+    else: 
+        return out[-1]
+
+
+def _equilibrate_FPM(nu_max, 
+                     gamma_max, 
+                     Kd_TAA, 
+                     Kd_TAA_star, 
+                     tau, 
+                     kappa_max, 
+                     phi_O, 
+                     phiRb=-1.0, 
+                     tol=3, 
+                     max_iter=50, 
+                     dt=0.0001, 
+                     t_return=1, 
+                     method='lsoda'):
+    """
+    Equilibrates the core flux-parity model using the compiled `fpm_rhs` and 
+    its analytic Jacobian `fpm_jac`. All model parameters are passed as 
+    positional floats. A negative `phiRb` corresponds to dynamically regulated 
+    allocation. If `method` is 'rk4', `equilibrate_rk4` is tried first and 
+    LSODA is used only if it does not converge within tolerance.
+    """
+    M0 = 1E9
+    alloc_space = (1 - phi_O) / 2
+    init_params = [M0, alloc_space * M0, alloc_space * M0, 1E-5, 1E-5]
+    rhs_args = (nu_max, gamma_max, Kd_TAA, Kd_TAA_star, tau, kappa_max, 
+                phi_O, phiRb)
+    if method == 'rk4':
+        params = np.array(rhs_args)
+        y, converged = equilibrate_rk4(np.array(init_params), params)
+        if phiRb < 0:
+            ratio = y[-1] / y[-2]
+            _phiRb = (1 - phi_O) * ratio / (ratio + tau)
+        else:
+            _phiRb = phiRb
+        if converged and (np.round(y[1] / _phiRb, decimals=tol) == 1):
+            # Step forward to the remaining time points to be returned
+            n_sub = int(np.ceil(dt / 1E-5))
+            out = [y]
+            for _ in range(t_return - 1):
+                for _ in range(n_sub):
+                    y = _rk4_step(y, params, dt / n_sub)
+                out.append(y)
+            out = M0 * np.array(out)
+            out[:, 3:] /= M0
+            if t_return != 1:
+                return out
+            else:
+                return out[-1]
+    return _equilibrate(fpm_rhs, rhs_args, init_params, phi_O, tau, phiRb, 
+                        tol, max_iter, dt, t_return, jac=fpm_jac, 
+                        tfirst=True)
+
+
+@functools.lru_cache(maxsize=4096)
+def _equilibrate_FPM_cached(nu_max, 
+                            gamma_max, 
+                            Kd_TAA, 
+                            Kd_TAA_star, 
+                            tau, 
+                            kappa_max, 
+                            phi_O, 
+                            phiRb=-1.0, 
+                            tol=3, 
+                            max_iter=50, 
+                            dt=0.0001, 
+                            t_return=1, 
+                            method='lsoda'):
+    """
+    Memoized version of `_equilibrate_FPM`. The returned array is shared 
+    between calls and is therefore marked read-only.
+    """
+    out = _equilibrate_FPM(nu_max, gamma_max, Kd_TAA, Kd_TAA_star, tau, 
+                           kappa_max, phi_O, phiRb, tol=tol, 
+                           max_iter=max_iter, dt=dt, t_return=t_return, 
+                           method=method)
+    out.setflags(write=False)
+    return out
+
+
 def equilibrate_FPM(args, 
                     tol=3, 
                     max_iter=50, 
                     dt=0.0001, 
-                    t_return=1):
+                    t_return=1, 
+                    method='lsoda'):
     """
     Numerically integrates the flux-parity model until steady-state is reached. 
 
@@ -30,6 +384,11 @@ def equilibrate_FPM(args,
     t_return: int
         The number of final N time points to return. Default is 1, returning 
         the final time step
+    method: str, 'lsoda' or 'rk4'
+        The integration scheme for the core flux-parity model. If 'rk4', the 
+        compiled fixed-step integrator `equilibrate_rk4` is tried first and 
+        LSODA is used as a fallback. Ignored if nutrients, antibiotics, 
+        alternative ansatzes, or f_a are supplied in args. Default is 'lsoda'.
 
     Returns
     -------
@@ -37,6 +396,22 @@ def equilibrate_FPM(args,
         Returns the number of elements of the integrator for the final  
         time point or points, given the value of t_return. 
     """
+    if not any(k in args.keys() for k in _FPM_MODIFIERS):
+        out = _equilibrate_FPM_cached(float(args['nu_max']), 
+                                      float(args['gamma_max']), 
+                                      float(args['Kd_TAA']), 
+                                      float(args['Kd_TAA_star']), 
+                                      float(args['tau']), 
+                                      float(args['kappa_max']), 
+                                      float(args['phi_O']), 
+                                      float(args.get('phiRb', -1.0)), 
+                                      tol=tol, 
+                                      max_iter=max_iter, 
+                                      dt=dt, 
+                                      t_return=t_return, 
+                                      method=method)
+        return out.copy()
+
     M0 = 1E9
     alloc_space = (1 - args['phi_O']) / 2
     phi_Rb = alloc_space
@@ -45,41 +420,140 @@ def equilibrate_FPM(args,
         init_params = [M0, phi_Rb * M0, phi_Mb * M0, args['nutrients']['c_nt'], 1E-5, 1E-5]
     else:
         init_params = [M0, phi_Rb * M0, phi_Mb * M0, 1E-5, 1E-5]
+    return _equilibrate(self_replicator_FPM, (args,), init_params, 
+                        args['phi_O'], args['tau'], args.get('phiRb', -1.0), 
+                        tol, max_iter, dt, t_return)
 
-    iterations = 1 
-    converged = False
+
+def _fpm_rhs_batch(t, 
+                   y, 
+                   nu_max, 
+                   gamma_max, 
+                   Kd_TAA, 
+                   Kd_TAA_star, 
+                   tau, 
+                   kappa_max, 
+                   phi_O, 
+                   phiRb):
+    """
+    Vectorized equivalent of `fpm_rhs` for a batch of independent systems. 
+    The state `y` is the flattened (N, 5) array of the individual states and 
+    all parameters are arrays of length N.
+    """
+    M, M_Rb, M_Mb, T_AA, T_AA_star = y.reshape(-1, 5).T
+
+    # Compute the capacities
+    gamma = gamma_max * (T_AA_star / (T_AA_star + Kd_TAA_star))
+    nu = nu_max * (T_AA / (T_AA + Kd_TAA))
+
+    # Resource allocation
+    allocation = T_AA_star / (T_AA_star + tau * T_AA)
+    dynamic = phiRb < 0
+    _phiRb = np.where(dynamic, (1 - phi_O) * allocation, phiRb)
+    kappa = np.where(dynamic, kappa_max * allocation, 
+                     phiRb * kappa_max / (1 - phi_O))
+
+    # Biomass accumulation and tRNA dynamics, including dilution
+    dM_dt = gamma * M_Rb
+    out = np.empty((len(M), 5))
+    out[:, 0] = dM_dt
+    out[:, 1] = _phiRb * dM_dt
+    out[:, 2] = (1 - _phiRb - phi_O) * dM_dt
+    out[:, 3] = (dM_dt - nu * M_Mb) / M + kappa - (T_AA * dM_dt) / M
+    out[:, 4] = (nu * M_Mb - dM_dt) / M - T_AA_star * dM_dt / M
+    return out.ravel()
+
+
+def equilibrate_FPM_batch(args, 
+                          tol=3, 
+                          max_iter=50, 
+                          dt=0.0001):
+    """
+    Numerically integrates a batch of core flux-parity models until each has 
+    reached steady-state. All systems are stacked into a single system of 
+    ODEs which is integrated with one call to scipy.integrate.odeint, rather 
+    than one call per system. 
+
+    Parameters 
+    -----------
+    args: dict
+        Dictionary of arguments as for `equilibrate_FPM`. Any of 'nu_max', 
+        'gamma_max', 'Kd_TAA', 'Kd_TAA_star', 'tau', 'kappa_max', 'phi_O', and 
+        'phiRb' may be provided as a 1d array, defining the batch. Scalars are 
+        shared across the batch. Nutrients, antibiotics, alternative ansatzes, 
+        and f_a are not supported. 
+    tol: int 
+        Absolute tolerance for finding equilibrium. See `equilibrate_FPM`. 
+        Default is 3 decimal places.
+    max_iter: int
+        The maximum number of interations over which to run the integration. 
+        Default is 50 iterations.
+    dt: float
+        Size of timestep to be taken. Default is 0.0001 time units
+
+    Returns
+    -------
+    out: 2d numpy array
+        The final time point of the integration for each system in the 
+        batch, with rows [M, M_Rb, M_Mb, T_AA, T_AA_star].
+    """
+    keys = ['nu_max', 'gamma_max', 'Kd_TAA', 'Kd_TAA_star', 'tau', 'kappa_max',
+            'phi_O']
+    params = [np.asarray(args[k], dtype=float) for k in keys]
+    params.append(np.asarray(args.get('phiRb', -1.0), dtype=float))
+    params = np.broadcast_arrays(*params)
+    n_sys = params[0].size
+    params = [np.ravel(p) for p in params]
+    phi_O, tau, phiRb = params[6], params[4], params[7]
+
+    # Set the initial conditions
+    M0 = 1E9
+    alloc_space = (1 - phi_O) / 2
+    init_params = np.zeros((n_sys, 5))
+    init_params[:, 0] = M0
+    init_params[:, 1] = alloc_space * M0
+    init_params[:, 2] = alloc_space * M0
+    init_params[:, 3:] = 1E-5
+
+    # Integrate until every system has converged. As the systems are 
+    # independent, the Jacobian is block-diagonal and is banded with a 
+    # bandwidth of 4. Systems which have converged are dropped from the batch.
     max_time = 200
-    while (iterations <= max_iter) & (converged == False):
-        time = np.arange(0, max_time, dt)
-        out = scipy.integrate.odeint(self_replicator_FPM, 
-                                    init_params, 
-                                    time,
-                                    args=(args,)) 
-    
-        # Determine if a steady state has been reached
-        ratio = out[-1][-1] / out[-1][-2]
-        MRb_M = out[-1][1] / out[-1][0]
-        if 'phiRb' not in args.keys():
-            phiRb = (1 - args['phi_O'] ) * ratio / (ratio + args['tau'])
-        else:
-            phiRb = args['phiRb']
-        ribo_ratio = MRb_M / phiRb
-        if np.round(ribo_ratio, decimals=tol) == 1:
-            converged = True
-        else:
-            MRb_M = out[-1][1]/out[-1][0]
-            MMb_M = out[-1][2]/out[-1][0]
-            init_params = [M0, MRb_M * M0, MMb_M * M0, out[-1][-2], out[-1][-1]]
-            # max_time += 10 
-            iterations +=1
+    n_steps = int(np.ceil(max_time / dt))
+    time = [0, (n_steps - 1) * dt]
+    out = np.zeros((n_sys, 5))
+    active = np.arange(n_sys)
+    iterations = 1
+    while (iterations <= max_iter) & (len(active) > 0):
+        _out = scipy.integrate.odeint(_fpm_rhs_batch, 
+                                      init_params[active].ravel(), 
+                                      time, 
+                                      args=tuple(p[active] for p in params), 
+                                      tfirst=True, 
+                                      mxstep=n_steps, 
+                                      ml=4, 
+                                      mu=4)
+        _out = _out[-1].reshape(-1, 5)
+        out[active] = _out
+
+        # Determine which systems have reached a steady state
+        ratio = _out[:, -1] / _out[:, -2]
+        MRb_M = _out[:, 1] / _out[:, 0]
+        _phiRb = np.where(phiRb[active] < 0, 
+                          (1 - phi_O[active]) * ratio / (ratio + tau[active]), 
+                          phiRb[active])
+        ribo_ratio = MRb_M / _phiRb
+        converged = np.round(ribo_ratio, decimals=tol) == 1
+        active, _out = active[~converged], _out[~converged]
+        if len(active) > 0:
+            init_params[active, 0] = M0
+            init_params[active, 1:3] = M0 * _out[:, 1:3] / _out[:, [0]]
+            init_params[active, 3:] = _out[:, 3:] 
+            iterations += 1
 
-       
         if iterations == max_iter:
-            print(f'Steady state was not reached (ratio of Mrb_M / phiRb= {np.round(ribo_ratio, decimals=tol)}. Returning output anyway.')
-    if t_return != 1:
-        return out[-t_return:]
-    else: 
-        return out[-1]
+            print(f'Steady state was not reached for {len(active)} of {n_sys} systems. Returning output anyway.')
+    return out
 
 
 def compute_nu(gamma_max, 
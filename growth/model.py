@@ -128,7 +128,7 @@ def steady_state_precursors(gamma_max,
     ----------
     gamma_max: positive float
         The maximum translational efficiency in units of inverse time.
-    phi_Rb: float [0, 1]
+    phi_Rb: float or array [0, 1]
         The fraction of the proteome occupied by ribosomal proteins.
     nu_max : positive float 
         The maximum nutritional capacity in units of inverse time. 
@@ -166,7 +166,7 @@ def steady_state_growth_rate(gamma_max,
     ----------
     gamma_max : positive float 
         The maximum translational capacity in units of inverse time.
-    phi_Rb : float [0, 1]
+    phi_Rb : float or array [0, 1]
         The fraction of the proteome occupied by ribosomal protein mass
     nu_max : positive float 
         The maximum nutritional capacity in units of inverse time. 
@@ -208,7 +208,7 @@ def steady_state_gamma(gamma_max,
     -----------
     gamma_max : positive float
         The maximum translational capacity in units of inverse time.
-    phi_Rb : float [0, 1]
+    phi_Rb : float or array [0, 1]
         The fraction of the proteome occupied by ribosomal protein mass.
     nu_max : positive float 
         The maximum nutritional capacity in units of inverse time.
@@ -229,6 +229,55 @@ def steady_state_gamma(gamma_max,
     return gamma_max * (c_pc / (c_pc + Kd_cpc))
 
 
+def steady_state_all(gamma_max,
+                     phi_Rb,
+                     nu_max,
+                     Kd_cpc,
+                     phi_O=0):
+    """
+    Computes the steady-state growth rate, charged-tRNA abundance, and 
+    translational efficiency of the self-replicator model in a single pass.
+
+    Parameters
+    ----------
+    gamma_max : positive float
+        The maximum translational capacity in units of inverse time.
+    phi_Rb : float or array [0, 1]
+        The fraction of the proteome occupied by ribosomal protein mass.
+    nu_max : positive float 
+        The maximum nutritional capacity in units of inverse time.
+    Kd_cpc : positive float 
+        The effective dissociation constant of charged tRNA to the elongating
+        ribosome.
+    phi_O : float [0, 1]
+        Allocation towards other proteins.
+
+    Returns
+    -------
+    lam : float or array
+        The steady-state growth rate in units of inverse time.
+    c_pc : float or array
+        The steady-state charged-tRNA abundance relative to the total biomass.
+    gamma : float or array
+        The steady-state translational efficiency in units of inverse time.
+
+    Notes
+    -----
+    This is equivalent to calling `steady_state_growth_rate`, 
+    `steady_state_precursors`, and `steady_state_gamma`, but the metabolic and 
+    translational fluxes and the growth rate are only evaluated once.
+    """
+    Nu = nu_max * (1 - phi_Rb - phi_O)
+    Gamma = gamma_max * phi_Rb
+    total = Nu + Gamma
+    one_minus_Kd = 1 - Kd_cpc
+    lam = (total - np.sqrt(total**2 - 4 * one_minus_Kd * Nu * Gamma)) /\
+        (2 * one_minus_Kd)
+    c_pc = Nu / lam - 1
+    gamma = gamma_max * (c_pc / (c_pc + Kd_cpc))
+    return lam, c_pc, gamma
+
+
 def phiRb_optimal_allocation(gamma_max,
                              nu_max,
                              Kd_cpc,
@@ -241,7 +290,7 @@ def phiRb_optimal_allocation(gamma_max,
     ----------
     gamma_max : positive float 
         The maximum translational efficiency in units of inverse time.
-    nu_max : positive float
+    nu_max : positive float or array
         The maximum nutritional capacity in units of inverse time.
     Kd_cpc: positive float 
         The effective dissociation constant of charged tRNA to the elongating 
@@ -253,10 +302,10 @@ def phiRb_optimal_allocation(gamma_max,
     phi_Rb_opt : positive float [0, 1]
         The optimal allocation to ribosomes.
     """
+    Kd_gamma_nu = Kd_cpc * gamma_max * nu_max
     numer = nu_max * (-2 * Kd_cpc * gamma_max + gamma_max + nu_max) +\
-        np.sqrt(Kd_cpc * gamma_max * nu_max) * (gamma_max - nu_max)
-    denom = -4 * Kd_cpc * gamma_max * nu_max + \
-        gamma_max**2 + 2 * gamma_max * nu_max + nu_max**2
+        np.sqrt(Kd_gamma_nu) * (gamma_max - nu_max)
+    denom = (gamma_max + nu_max)**2 - 4 * Kd_gamma_nu
     phi_Rb_opt = (1 - phi_O) * numer / denom
     return phi_Rb_opt
 
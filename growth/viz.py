@@ -1,14 +1,11 @@
-import matplotlib.pyplot 
-import matplotlib
-import seaborn as sns
 import bokeh.plotting 
 import bokeh.io 
 import bokeh.palettes
 import bokeh.themes
 from bokeh.models import * 
-from mpl_toolkits.axes_grid1 import make_axes_locatable
-from matplotlib.offsetbox import AnchoredText
-import seaborn as sns
+
+# matplotlib and seaborn are imported within the functions which use them such 
+# that bokeh-only scripts do not pay for their import.
 
 
 def load_markercolors():
@@ -16,6 +13,7 @@ def load_markercolors():
     Returns a dictionary mapping sources of the E. coli data with standard colors 
     and glyphs. This ensures constant marking of data across plots.
     """
+    import seaborn as sns
     colors, _ = get_colors()
     mapper = {
         'Bremer & Dennis, 2008': {'m':'X', 'm_bokeh':'circle_dot'},
@@ -150,6 +148,9 @@ def matplotlib_style(return_colors=True, return_palette=True, **kwargs):
     return_palette: bool
         If True, a sequential color palette is returned. Default is True.
     """
+    import matplotlib.style
+    import seaborn as sns
+
     # Define the matplotlib styles.
     rc = {
         # Axes formatting